@@ -2,16 +2,23 @@
 CSharp Language Server using Microsoft.CodeAnalysis.LanguageServer (Official Roslyn-based LSP server)
 """
 
+import errno
+import functools
 import json
 import logging
 import os
 import platform
 import shutil
 import subprocess
+import sys
 import tarfile
 import threading
 import urllib.request
 import zipfile
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import cast
 
@@ -126,48 +133,238 @@ RUNTIME_DEPENDENCIES = [
 ]
 
 
-def breadth_first_file_scan(root_dir):
+# Block size used when streaming downloads to disk (the packages and runtimes are tens of megabytes in size)
+_DOWNLOAD_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Directories which are ignored in C# projects (build outputs, package caches, IDE state), see is_ignored_dirname
+_IGNORED_DIRNAMES = frozenset(("bin", "obj", "packages", ".vs"))
+
+# Directories which are not searched for solution/project files, as they never contain relevant ones
+_SCAN_IGNORED_DIRNAMES = _IGNORED_DIRNAMES | {"node_modules"}
+
+# Suffixes of the files which are searched for, allowing the (vast majority of) other files to be rejected with a single check
+_SOLUTION_OR_PROJECT_SUFFIXES = (".sln", ".csproj")
+
+
+# All symbol kinds defined by the LSP specification (1 = File, ..., 26 = TypeParameter)
+_SYMBOL_KIND_VALUE_SET = tuple(range(1, 27))
+
+# Client capabilities sent in the initialize request; they are static, so the (read-only) structure is shared by all requests
+_CLIENT_CAPABILITIES = {
+    "window": {
+        "workDoneProgress": True,
+        "showMessage": {"messageActionItem": {"additionalPropertiesSupport": True}},
+        "showDocument": {"support": True},
+    },
+    "workspace": {
+        "applyEdit": True,
+        "workspaceEdit": {"documentChanges": True},
+        "didChangeConfiguration": {"dynamicRegistration": True},
+        "didChangeWatchedFiles": {"dynamicRegistration": True},
+        "symbol": {
+            "dynamicRegistration": True,
+            "symbolKind": {"valueSet": _SYMBOL_KIND_VALUE_SET},
+        },
+        "executeCommand": {"dynamicRegistration": True},
+        "configuration": True,
+        "workspaceFolders": True,
+        "workDoneProgress": True,
+    },
+    "textDocument": {
+        "synchronization": {"dynamicRegistration": True, "willSave": True, "willSaveWaitUntil": True, "didSave": True},
+        "hover": {"dynamicRegistration": True, "contentFormat": ["markdown", "plaintext"]},
+        "signatureHelp": {
+            "dynamicRegistration": True,
+            "signatureInformation": {
+                "documentationFormat": ["markdown", "plaintext"],
+                "parameterInformation": {"labelOffsetSupport": True},
+            },
+        },
+        "definition": {"dynamicRegistration": True},
+        "references": {"dynamicRegistration": True},
+        "documentSymbol": {
+            "dynamicRegistration": True,
+            "symbolKind": {"valueSet": _SYMBOL_KIND_VALUE_SET},
+            "hierarchicalDocumentSymbolSupport": True,
+        },
+    },
+}
+
+
+# Values of workspace configuration sections which are requested by their exact name
+_WORKSPACE_CONFIGURATION_VALUES = {
+    "tab_width": 4,
+    "indent_size": 4,
+    "insert_final_newline": True,
+    "dotnet_member_insertion_location": "with_other_members_of_the_same_kind",  # ImplementTypeInsertionBehavior enum
+    "dotnet_property_generation_behavior": "prefer_throwing_properties",  # ImplementTypePropertyGenerationBehavior enum
+}
+
+# Keywords identifying boolean dotnet/csharp settings
+_BOOLEAN_SETTING_KEYWORDS = ("enable", "show", "suppress", "navigate")
+
+
+def _get_workspace_configuration_value(section: str):
     """
-    Perform a breadth-first scan of files in the given directory.
-    Yields file paths in breadth-first order.
+    Returns the value to report for the given workspace configuration section, which is requested by the server.
+    """
+    if section in _WORKSPACE_CONFIGURATION_VALUES:
+        return _WORKSPACE_CONFIGURATION_VALUES[section]
+    if section.startswith(("dotnet", "csharp")):
+        if any(keyword in section for keyword in _BOOLEAN_SETTING_KEYWORDS):
+            return False
+        if "scope" in section:
+            # BackgroundAnalysisScope/CompilerDiagnosticsScope enums
+            return "openFiles"
+    # Unknown configuration as well as other enum settings (for which null avoids parsing errors)
+    return None
+
+
+def _walk_breadth_first(root_dir, ignored_dirnames: frozenset[str] = frozenset()) -> Iterator[tuple[str, list[str]]]:
+    """
+    Walks the given directory tree breadth-first, i.e. level by level (whereas os.walk proceeds depth-first),
+    yielding a tuple (dirpath, filenames) for each directory.
+    Hidden files and directories are skipped; directories with the given names are pruned.
     """
-    queue = [root_dir]
+    queue = deque((root_dir,))
     while queue:
-        current_dir = queue.pop(0)
+        current_dir = queue.popleft()
+        filenames = []
         try:
-            for item in os.listdir(current_dir):
-                if item.startswith("."):
-                    continue
-                item_path = os.path.join(current_dir, item)
-                if os.path.isdir(item_path):
-                    queue.append(item_path)
-                elif os.path.isfile(item_path):
-                    yield item_path
+            # os.scandir provides the entry type from the directory listing itself, avoiding a stat call per entry
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in ignored_dirnames:
+                            queue.append(entry.path)
+                    elif entry.is_file():
+                        filenames.append(name)
         except (PermissionError, OSError):
             # Skip directories we can't access
-            pass
+            continue
+        yield current_dir, filenames
+
+
+def breadth_first_file_scan(root_dir):
+    """
+    Perform a breadth-first scan of files in the given directory.
+    Yields file paths in breadth-first order.
+    """
+    for dirpath, filenames in _walk_breadth_first(root_dir):
+        for filename in filenames:
+            yield os.path.join(dirpath, filename)
 
 
 def find_solution_or_project_file(root_dir) -> str | None:
     """
     Find the first .sln file in breadth-first order.
     If no .sln file is found, look for a .csproj file.
+
+    This is based on the same (cached) scan which determines the files opened in the language server;
+    the scan is repeated whenever a language server instance is created, see reset_discovery_cache.
+    """
+    sln_file, csproj_files = _scan_solution_and_project_files(root_dir)
+    if sln_file is not None:
+        return sln_file
+    return csproj_files[0] if csproj_files else None
+
+
+def reset_discovery_cache() -> None:
+    """
+    Clears the cached results of the scan for solution and project files (see find_solution_or_project_file),
+    such that solution or project files which were added or removed are taken into account.
+    Called whenever a CSharpLanguageServer is created, i.e. on every start/restart of the language server.
+    """
+    _scan_solution_and_project_files_cached.cache_clear()
+
+
+def _scan_solution_and_project_files(root_dir) -> tuple[str | None, list[str]]:
+    """
+    Scan the given directory breadth-first in a single pass, collecting the first .sln file
+    as well as all .csproj files (both in breadth-first order).
+
+    Results are cached per directory until the cache is reset (which happens whenever a language server instance
+    is created), see reset_discovery_cache.
+    """
+    sln_file, csproj_files = _scan_solution_and_project_files_cached(os.path.realpath(root_dir))
+    return (
+        os.path.join(root_dir, sln_file) if sln_file is not None else None,
+        [os.path.join(root_dir, csproj_file) for csproj_file in csproj_files],
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _scan_solution_and_project_files_cached(root_dir: str) -> tuple[str | None, tuple[str, ...]]:
+    """
+    :param root_dir: the canonical path of the directory to scan
+    :return: the paths of the first .sln file and of all .csproj files, relative to root_dir
     """
     sln_file = None
-    csproj_file = None
+    csproj_files = []
+
+    for dirpath, filenames in _walk_breadth_first(root_dir, _SCAN_IGNORED_DIRNAMES):
+        for filename in filenames:
+            if filename.endswith(_SOLUTION_OR_PROJECT_SUFFIXES):
+                relative_path = os.path.relpath(os.path.join(dirpath, filename), root_dir)
+                if not filename.endswith(".sln"):
+                    csproj_files.append(relative_path)
+                elif sln_file is None:
+                    sln_file = relative_path
+
+    return sln_file, tuple(csproj_files)
+
+
+@functools.lru_cache(maxsize=8)
+def _list_dotnet_runtimes(dotnet_path: str, mtime_ns: int) -> str | None:
+    """
+    Returns the output of `dotnet --list-runtimes` for the given dotnet executable or None if the command failed.
+    The result is cached for the lifetime of the process, as starting the dotnet host is slow;
+    the executable's modification time is part of the cache key, such that an updated installation is queried anew.
+    """
+    try:
+        result = subprocess.run([dotnet_path, "--list-runtimes"], capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError:
+        return None
+    return result.stdout
 
-    for filename in breadth_first_file_scan(root_dir):
-        if filename.endswith(".sln") and sln_file is None:
-            sln_file = filename
-        elif filename.endswith(".csproj") and csproj_file is None:
-            csproj_file = filename
 
-        # If we found a .sln file, return it immediately
-        if sln_file:
-            return sln_file
+@contextmanager
+def _interprocess_lock(lock_path: Path, logger: LanguageServerLogger) -> Iterator[None]:
+    """
+    Holds an exclusive lock on the given lock file for the duration of the context, waiting until it can be acquired.
+    The lock is released by the operating system should the process die while holding it.
+    """
+    with open(lock_path, "a+b") as lock_file:
+        fd = lock_file.fileno()
+        if sys.platform == "win32":
+            import msvcrt
+
+            while True:
+                try:
+                    lock_file.seek(0)
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    # LK_LOCK gives up with EDEADLOCK after ten attempts (one per second) while another process holds
+                    # the lock, in which case we keep waiting; any other error is not going to go away
+                    if e.errno != errno.EDEADLOCK:
+                        raise
+                    logger.log(f"Waiting for another process to release the lock {lock_path}", logging.INFO)
+        else:
+            import fcntl
 
-    # If no .sln file was found, return the first .csproj file
-    return csproj_file
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
 
 
 class CSharpLanguageServer(SolidLanguageServer):
@@ -185,6 +382,10 @@ class CSharpLanguageServer(SolidLanguageServer):
         """
         dotnet_path, language_server_path = self._ensure_server_installed(logger, config, solidlsp_settings)
 
+        # Every (re)start scans the repository anew, as solution/project files may have been added or removed in the meantime;
+        # the scan is then shared with the opening of the solution/projects (see _open_solution_and_projects)
+        reset_discovery_cache()
+
         # Find solution or project file
         solution_or_project = find_solution_or_project_file(repository_root_path)
 
@@ -216,7 +417,7 @@ class CSharpLanguageServer(SolidLanguageServer):
 
     @override
     def is_ignored_dirname(self, dirname: str) -> bool:
-        return super().is_ignored_dirname(dirname) or dirname in ["bin", "obj", "packages", ".vs"]
+        return super().is_ignored_dirname(dirname) or dirname in _IGNORED_DIRNAMES
 
     @classmethod
     def _ensure_server_installed(
@@ -228,8 +429,23 @@ class CSharpLanguageServer(SolidLanguageServer):
         """
         runtime_id = CSharpLanguageServer._get_runtime_id()
         lang_server_dep, dotnet_runtime_dep = CSharpLanguageServer._get_runtime_dependencies(runtime_id)
-        dotnet_path = CSharpLanguageServer._ensure_dotnet_runtime(logger, dotnet_runtime_dep, solidlsp_settings)
-        server_dll_path = CSharpLanguageServer._ensure_language_server(logger, lang_server_dep, solidlsp_settings)
+
+        # Any migration of the resources directory is performed before the threads below use it
+        cls.ls_resources_dir(solidlsp_settings)
+
+        # The .NET runtime and the language server are independent of each other; on a cold start, both may need
+        # to be downloaded and extracted, so the runtime is obtained in a separate thread
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="CSharpDotNetRuntime") as executor:
+            dotnet_path_future = executor.submit(CSharpLanguageServer._ensure_dotnet_runtime, logger, dotnet_runtime_dep, solidlsp_settings)
+            try:
+                server_dll_path = CSharpLanguageServer._ensure_language_server(logger, lang_server_dep, solidlsp_settings)
+            except Exception as e:
+                # The failure is reported right away, but the runtime installation (which writes to the shared resources
+                # directory) is still waited for when leaving the executor's context, such that a subsequent attempt to
+                # start the server does not install the runtime concurrently
+                logger.log(f"Failed to provide the C# language server: {e}", logging.ERROR)
+                raise
+            dotnet_path = dotnet_path_future.result()
 
         return dotnet_path, server_dll_path
 
@@ -276,13 +492,10 @@ class CSharpLanguageServer(SolidLanguageServer):
         system_dotnet = shutil.which("dotnet")
         if system_dotnet:
             # Check if it's .NET 9
-            try:
-                result = subprocess.run([system_dotnet, "--list-runtimes"], capture_output=True, text=True, check=True)
-                if "Microsoft.NETCore.App 9." in result.stdout:
-                    logger.log("Found system .NET 9 runtime", logging.INFO)
-                    return system_dotnet
-            except subprocess.CalledProcessError:
-                pass
+            runtimes = _list_dotnet_runtimes(system_dotnet, os.stat(system_dotnet).st_mtime_ns)
+            if runtimes is not None and "Microsoft.NETCore.App 9." in runtimes:
+                logger.log("Found system .NET 9 runtime", logging.INFO)
+                return system_dotnet
 
         # Download .NET 9 runtime using config
         return cls._ensure_dotnet_runtime_from_config(logger, runtime_dep, solidlsp_settings)
@@ -297,64 +510,146 @@ class CSharpLanguageServer(SolidLanguageServer):
 
         server_dir = Path(cls.ls_resources_dir(solidlsp_settings)) / f"{package_name}.{package_version}"
         server_dll = server_dir / lang_server_dep.binary_name
+        # Marker file which is only written once the installation has completed successfully, such that
+        # an interrupted installation (which may have left the DLL in place) is not mistaken for a complete one
+        install_marker = server_dir / ".extracted.ok"
 
-        if server_dll.exists():
+        if install_marker.exists() and server_dll.exists():
             logger.log(f"Using cached Microsoft.CodeAnalysis.LanguageServer from {server_dll}", logging.INFO)
             return str(server_dll)
 
-        # Download and install the language server
+        # Download and install the language server.
+        # The installation is prepared in a staging directory specific to this process and then moved into place
+        # (while holding an inter-process lock), such that concurrently starting instances (which share the resources
+        # directory) never use or write to a partial installation.
         logger.log(f"Downloading {package_name} version {package_version}...", logging.INFO)
-        package_path = cls._download_nuget_package_direct(logger, package_name, package_version, solidlsp_settings)
+        staging_dir = server_dir.with_name(f"{server_dir.name}.{os.getpid()}.tmp")
+        staging_dll = staging_dir / lang_server_dep.binary_name
+        try:
+            # Only the directories which may contain the language server are extracted (without debug symbols)
+            package_path = cls._download_nuget_package_direct(
+                logger,
+                package_name,
+                package_version,
+                solidlsp_settings,
+                include_patterns=[f"{package_dir}/*" for package_dir in cls._get_language_server_package_dirs(lang_server_dep)],
+                exclude_patterns=["*.pdb"],
+            )
 
-        # Extract and install
-        cls._extract_language_server(lang_server_dep, package_path, server_dir)
+            # Extract and install
+            try:
+                cls._extract_language_server(lang_server_dep, package_path, staging_dir)
+            finally:
+                shutil.rmtree(package_path, ignore_errors=True)
 
-        if not server_dll.exists():
-            raise SolidLSPException("Microsoft.CodeAnalysis.LanguageServer.dll not found after extraction")
+            if not staging_dll.exists():
+                raise SolidLSPException("Microsoft.CodeAnalysis.LanguageServer.dll not found after extraction")
+
+            # Make executable on Unix systems
+            if platform.system().lower() != "windows":
+                staging_dll.chmod(0o755)
 
-        # Make executable on Unix systems
-        if platform.system().lower() != "windows":
-            server_dll.chmod(0o755)
+            (staging_dir / install_marker.name).touch()
+
+            # Moving the installation into place is serialised across processes, and the marker is checked only once the
+            # lock is held, such that a completed installation (which another process may already be using) is never removed
+            with _interprocess_lock(server_dir.with_name(f"{server_dir.name}.lock"), logger):
+                if install_marker.exists():
+                    logger.log("Microsoft.CodeAnalysis.LanguageServer was installed by another process in the meantime", logging.INFO)
+                else:
+                    # The remains of an earlier installation (which is incomplete or predates the marker file) are moved aside
+                    # rather than removed in place: On Windows, this fails as a whole while the installation is in use
+                    # (by another running instance), whereas removing it would delete some of its files before failing
+                    if server_dir.exists():
+                        previous_dir = server_dir.with_name(f"{server_dir.name}.{os.getpid()}.old")
+                        try:
+                            os.replace(server_dir, previous_dir)
+                        except OSError as e:
+                            if not server_dll.exists():
+                                raise
+                            logger.log(
+                                f"Could not replace the existing installation in {server_dir}, which may be in use ({e}); using it as is",
+                                logging.WARNING,
+                            )
+                            return str(server_dll)
+                        shutil.rmtree(previous_dir, ignore_errors=True)
+                    os.replace(staging_dir, server_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        if not server_dll.exists():
+            raise SolidLSPException("Microsoft.CodeAnalysis.LanguageServer.dll not found after installation")
 
         logger.log(f"Successfully installed Microsoft.CodeAnalysis.LanguageServer to {server_dll}", logging.INFO)
         return str(server_dll)
 
     @staticmethod
-    def _extract_language_server(lang_server_dep: RuntimeDependency, package_path: Path, server_dir: Path) -> None:
+    def _get_language_server_package_dirs(lang_server_dep: RuntimeDependency) -> list[str]:
+        """
+        Returns the directories (relative to the package root) which may contain the language server files,
+        in order of preference.
+        """
+        return [lang_server_dep.extract_path or "lib/net9.0", "tools/net9.0/any", "lib/net9.0", "contentFiles/any/net9.0"]
+
+    @classmethod
+    def _extract_language_server(cls, lang_server_dep: RuntimeDependency, package_path: Path, server_dir: Path) -> None:
         """Extract language server files from downloaded package."""
-        extract_path = lang_server_dep.extract_path or "lib/net9.0"
-        source_dir = package_path / extract_path
-
-        if not source_dir.exists():
-            # Try alternative locations
-            for possible_dir in [
-                package_path / "tools" / "net9.0" / "any",
-                package_path / "lib" / "net9.0",
-                package_path / "contentFiles" / "any" / "net9.0",
-            ]:
-                if possible_dir.exists():
-                    source_dir = possible_dir
-                    break
-            else:
-                raise SolidLSPException(f"Could not find language server files in package. Searched in {package_path}")
+        for package_dir in cls._get_language_server_package_dirs(lang_server_dep):
+            source_dir = package_path / package_dir
+            if source_dir.exists():
+                break
+        else:
+            raise SolidLSPException(f"Could not find language server files in package. Searched in {package_path}")
 
         # Copy files to cache directory
         server_dir.mkdir(parents=True, exist_ok=True)
         shutil.copytree(source_dir, server_dir, dirs_exist_ok=True)
 
+    @staticmethod
+    def _download_file(url: str, target_path: Path) -> None:
+        """
+        Download the given URL to the given path, streaming the response in large blocks.
+        The file is first written to a temporary file, which is moved into place only once the download is complete,
+        such that an interrupted download never leaves a truncated file at the target path.
+        """
+        part_path = target_path.with_name(target_path.name + ".part")
+        try:
+            with urllib.request.urlopen(url) as response:
+                expected_size = int(response.headers.get("Content-Length", 0))
+                with open(part_path, "wb") as f:
+                    shutil.copyfileobj(response, f, length=_DOWNLOAD_BUFFER_SIZE)
+            if expected_size and part_path.stat().st_size != expected_size:
+                raise SolidLSPException(f"Incomplete download from {url}: received {part_path.stat().st_size} of {expected_size} bytes")
+            os.replace(part_path, target_path)
+        finally:
+            part_path.unlink(missing_ok=True)
+
     @classmethod
     def _download_nuget_package_direct(
-        cls, logger: LanguageServerLogger, package_name: str, package_version: str, solidlsp_settings: SolidLSPSettings
+        cls,
+        logger: LanguageServerLogger,
+        package_name: str,
+        package_version: str,
+        solidlsp_settings: SolidLSPSettings,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
     ) -> Path:
         """
         Download a NuGet package directly from the Azure NuGet feed.
         Returns the path to the extracted package directory.
+
+        :param include_patterns: glob patterns of the package entries to extract (None = all entries)
+        :param exclude_patterns: glob patterns of package entries to skip
         """
         azure_feed_url = "https://pkgs.dev.azure.com/azure-public/vside/_packaging/vs-impl/nuget/v3/index.json"
 
         # Create temporary directory for package download
         temp_dir = Path(cls.ls_resources_dir(solidlsp_settings)) / "temp_downloads"
         temp_dir.mkdir(parents=True, exist_ok=True)
+        # Names specific to this process are used, as the resources directory is shared
+        download_name = f"{package_name}.{package_version}.{os.getpid()}"
+        nupkg_file = temp_dir / f"{download_name}.nupkg"
+        package_extract_dir = temp_dir / download_name
 
         try:
             # First, get the service index from the Azure feed
@@ -380,48 +675,43 @@ class CSharpLanguageServer(SolidLanguageServer):
             logger.log(f"Downloading package from: {package_url}", logging.DEBUG)
 
             # Download the .nupkg file
-            nupkg_file = temp_dir / f"{package_name}.{package_version}.nupkg"
-            urllib.request.urlretrieve(package_url, nupkg_file)
+            cls._download_file(package_url, nupkg_file)
 
             # Extract the .nupkg file (it's just a zip file)
-            package_extract_dir = temp_dir / f"{package_name}.{package_version}"
             package_extract_dir.mkdir(exist_ok=True)
 
             # Use SafeZipExtractor to handle long paths and skip errors
-            extractor = SafeZipExtractor(archive_path=nupkg_file, extract_dir=package_extract_dir, verbose=False)
+            extractor = SafeZipExtractor(
+                archive_path=nupkg_file,
+                extract_dir=package_extract_dir,
+                verbose=False,
+                include_patterns=include_patterns,
+                exclude_patterns=exclude_patterns,
+            )
             extractor.extract_all()
 
-            # Clean up the nupkg file
-            nupkg_file.unlink()
-
             logger.log(f"Successfully downloaded and extracted {package_name} version {package_version}", logging.INFO)
             return package_extract_dir
 
         except Exception as e:
+            # Don't leave a partially extracted package behind
+            shutil.rmtree(package_extract_dir, ignore_errors=True)
             raise SolidLSPException(
                 f"Failed to download package {package_name} version {package_version} from Azure NuGet feed: {e}"
             ) from e
+        finally:
+            # Clean up the nupkg file
+            nupkg_file.unlink(missing_ok=True)
 
     @classmethod
     def _ensure_dotnet_runtime_from_config(
         cls, logger: LanguageServerLogger, runtime_dep: RuntimeDependency, solidlsp_settings: SolidLSPSettings
     ) -> str:
         """
-        Ensure .NET 9 runtime is available using runtime dependency configuration.
+        Ensure .NET 9 runtime is available using runtime dependency configuration
+        (the system-wide installation is checked by the caller, see _ensure_dotnet_runtime).
         Returns the path to the dotnet executable.
         """
-        # Check if dotnet is already available on the system
-        system_dotnet = shutil.which("dotnet")
-        if system_dotnet:
-            # Check if it's .NET 9
-            try:
-                result = subprocess.run([system_dotnet, "--list-runtimes"], capture_output=True, text=True, check=True)
-                if "Microsoft.NETCore.App 9." in result.stdout:
-                    logger.log("Found system .NET 9 runtime", logging.INFO)
-                    return system_dotnet
-            except subprocess.CalledProcessError:
-                pass
-
         # Download .NET 9 runtime using config
         dotnet_dir = Path(cls.ls_resources_dir(solidlsp_settings)) / "dotnet-runtime-9.0"
         dotnet_exe = dotnet_dir / runtime_dep.binary_name
@@ -441,7 +731,7 @@ class CSharpLanguageServer(SolidLanguageServer):
         download_path = dotnet_dir / f"dotnet-runtime.{archive_type}"
         try:
             logger.log(f"Downloading from {url}", logging.DEBUG)
-            urllib.request.urlretrieve(url, download_path)
+            cls._download_file(url, download_path)
 
             # Extract the archive
             if archive_type == "zip":
@@ -478,45 +768,7 @@ class CSharpLanguageServer(SolidLanguageServer):
                 "processId": os.getpid(),
                 "rootPath": self.repository_root_path,
                 "rootUri": root_uri,
-                "capabilities": {
-                    "window": {
-                        "workDoneProgress": True,
-                        "showMessage": {"messageActionItem": {"additionalPropertiesSupport": True}},
-                        "showDocument": {"support": True},
-                    },
-                    "workspace": {
-                        "applyEdit": True,
-                        "workspaceEdit": {"documentChanges": True},
-                        "didChangeConfiguration": {"dynamicRegistration": True},
-                        "didChangeWatchedFiles": {"dynamicRegistration": True},
-                        "symbol": {
-                            "dynamicRegistration": True,
-                            "symbolKind": {"valueSet": list(range(1, 27))},
-                        },
-                        "executeCommand": {"dynamicRegistration": True},
-                        "configuration": True,
-                        "workspaceFolders": True,
-                        "workDoneProgress": True,
-                    },
-                    "textDocument": {
-                        "synchronization": {"dynamicRegistration": True, "willSave": True, "willSaveWaitUntil": True, "didSave": True},
-                        "hover": {"dynamicRegistration": True, "contentFormat": ["markdown", "plaintext"]},
-                        "signatureHelp": {
-                            "dynamicRegistration": True,
-                            "signatureInformation": {
-                                "documentationFormat": ["markdown", "plaintext"],
-                                "parameterInformation": {"labelOffsetSupport": True},
-                            },
-                        },
-                        "definition": {"dynamicRegistration": True},
-                        "references": {"dynamicRegistration": True},
-                        "documentSymbol": {
-                            "dynamicRegistration": True,
-                            "symbolKind": {"valueSet": list(range(1, 27))},
-                            "hierarchicalDocumentSymbolSupport": True,
-                        },
-                    },
-                },
+                "capabilities": _CLIENT_CAPABILITIES,
             },
         )
 
@@ -539,8 +791,9 @@ class CSharpLanguageServer(SolidLanguageServer):
             token = params.get("token", "")
             value = params.get("value", {})
 
-            # Log raw progress for debugging
-            self.logger.log(f"Progress notification received: {params}", logging.DEBUG)
+            # Log raw progress for debugging (the server sends many notifications while indexing, so avoid formatting them needlessly)
+            if self.logger.is_enabled_for(logging.DEBUG):
+                self.logger.log(f"Progress notification received: {params}", logging.DEBUG)
 
             # Handle different progress notification types
             kind = value.get("kind")
@@ -570,49 +823,7 @@ class CSharpLanguageServer(SolidLanguageServer):
 
         def handle_workspace_configuration(params):
             """Handle workspace/configuration requests from the server."""
-            items = params.get("items", [])
-            result = []
-
-            for item in items:
-                section = item.get("section", "")
-
-                # Provide default values based on the configuration section
-                if section.startswith(("dotnet", "csharp")):
-                    # Default configuration for C# settings
-                    if "enable" in section or "show" in section or "suppress" in section or "navigate" in section:
-                        # Boolean settings
-                        result.append(False)
-                    elif "scope" in section:
-                        # Scope settings - use appropriate enum values
-                        if "analyzer_diagnostics_scope" in section:
-                            result.append("openFiles")  # BackgroundAnalysisScope
-                        elif "compiler_diagnostics_scope" in section:
-                            result.append("openFiles")  # CompilerDiagnosticsScope
-                        else:
-                            result.append("openFiles")
-                    elif section == "dotnet_member_insertion_location":
-                        # ImplementTypeInsertionBehavior enum
-                        result.append("with_other_members_of_the_same_kind")
-                    elif section == "dotnet_property_generation_behavior":
-                        # ImplementTypePropertyGenerationBehavior enum
-                        result.append("prefer_throwing_properties")
-                    elif "location" in section or "behavior" in section:
-                        # Other enum settings - return null to avoid parsing errors
-                        result.append(None)
-                    else:
-                        # Default for other dotnet/csharp settings
-                        result.append(None)
-                elif section == "tab_width" or section == "indent_size":
-                    # Tab and indent settings
-                    result.append(4)
-                elif section == "insert_final_newline":
-                    # Editor settings
-                    result.append(True)
-                else:
-                    # Unknown configuration - return null
-                    result.append(None)
-
-            return result
+            return [_get_workspace_configuration_value(item.get("section", "")) for item in params.get("items", [])]
 
         def handle_work_done_progress_create(params):
             """Handle work done progress create requests."""
@@ -650,7 +861,8 @@ class CSharpLanguageServer(SolidLanguageServer):
         self.logger.log("Sending initialize request to language server", logging.INFO)
         try:
             init_response = self.server.send.initialize(initialize_params)
-            self.logger.log(f"Received initialize response: {init_response}", logging.DEBUG)
+            if self.logger.is_enabled_for(logging.DEBUG):
+                self.logger.log(f"Received initialize response: {init_response}", logging.DEBUG)
         except Exception as e:
             raise SolidLSPException(f"Failed to initialize C# language server for {self.repository_root_path}: {e}") from e
 
@@ -711,12 +923,8 @@ class CSharpLanguageServer(SolidLanguageServer):
         """
         Open solution and project files using notifications.
         """
-        # Find solution file
-        solution_file = None
-        for filename in breadth_first_file_scan(self.repository_root_path):
-            if filename.endswith(".sln"):
-                solution_file = filename
-                break
+        # Find solution file and project files
+        solution_file, project_files = _scan_solution_and_project_files(self.repository_root_path)
 
         # Send solution/open notification if solution file found
         if solution_file:
@@ -724,12 +932,6 @@ class CSharpLanguageServer(SolidLanguageServer):
             self.server.notify.send_notification("solution/open", {"solution": solution_uri})
             self.logger.log(f"Opened solution file: {solution_file}", logging.INFO)
 
-        # Find and open project files
-        project_files = []
-        for filename in breadth_first_file_scan(self.repository_root_path):
-            if filename.endswith(".csproj"):
-                project_files.append(filename)
-
         # Send project/open notifications for each project file
         if project_files:
             project_uris = [PathUtils.path_to_uri(project_file) for project_file in project_files]
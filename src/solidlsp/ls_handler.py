@@ -378,13 +378,15 @@ class SolidLanguageServerHandler:
                 line = self.process.stderr.readline()
                 if not line:
                     continue
-                line = line.decode(ENCODING, errors="replace")
+                # determine the level based on the raw bytes, such that the line is decoded only once
                 line_lower = line.lower()
-                if "error" in line_lower or "exception" in line_lower or line.startswith("E["):
+                if b"error" in line_lower or b"exception" in line_lower or line.startswith(b"E["):
                     level = logging.ERROR
                 else:
                     level = logging.INFO
-                log.log(level, line)
+                # chatty servers can write many lines per second; don't decode lines which would be discarded anyway
+                if log.isEnabledFor(level):
+                    log.log(level, line.decode(ENCODING, errors="replace"))
         except Exception as e:
             log.error("Error while reading stderr from language server process: %s", e, exc_info=e)
         if not self._is_shutting_down:
@@ -36,6 +36,10 @@ class LanguageServerLogger:
         """
         Log the debug and sanitized messages using the logger
         """
+        if not self.logger.isEnabledFor(level):
+            # avoid the (comparatively expensive) message sanitisation and caller inspection for discarded messages
+            return
+
         debug_message = debug_message.replace("'", '"').replace("\n", " ")
         sanitized_error_message = sanitized_error_message.replace("'", '"').replace("\n", " ")
 
@@ -64,3 +68,10 @@ class LanguageServerLogger:
             )
         else:
             self.logger.log(level, debug_message, stacklevel=stacklevel)
+
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Returns whether messages of the given level are logged, which allows callers to skip
+        building expensive log messages
+        """
+        return self.logger.isEnabledFor(level)
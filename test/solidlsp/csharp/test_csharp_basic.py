@@ -9,14 +9,26 @@ import pytest
 from solidlsp import SolidLanguageServer
 from solidlsp.language_servers.csharp_language_server import (
     CSharpLanguageServer,
+    _get_workspace_configuration_value,
+    _scan_solution_and_project_files,
+    _scan_solution_and_project_files_cached,
     breadth_first_file_scan,
     find_solution_or_project_file,
+    reset_discovery_cache,
 )
 from solidlsp.ls_config import Language, LanguageServerConfig
 from solidlsp.ls_utils import SymbolUtils
 from solidlsp.settings import SolidLSPSettings
 
 
+@pytest.fixture(autouse=True)
+def clear_discovery_cache():
+    """Ensures that tests do not depend on solution/project discovery results cached by other tests."""
+    reset_discovery_cache()
+    yield
+    reset_discovery_cache()
+
+
 @pytest.mark.csharp
 class TestCSharpLanguageServer:
     @pytest.mark.parametrize("language_server", [Language.CSHARP], indirect=True)
@@ -235,6 +247,87 @@ class TestCSharpSolutionProjectOpening:
             # Should still prefer .sln file even though it's deeper
             assert result == str(solution_file)
 
+    def test_find_solution_or_project_file_skips_ignored_directories(self):
+        """Test that build output and hidden directories are not searched."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+
+            project_file = temp_path / "MyProject.csproj"
+            project_file.touch()
+
+            # Solution files in ignored directories must not be picked up
+            for ignored_dir in ["bin", "obj", ".vs", "node_modules"]:
+                (temp_path / ignored_dir).mkdir()
+                (temp_path / ignored_dir / "Ignored.sln").touch()
+
+            result = find_solution_or_project_file(str(temp_path))
+
+            assert result == str(project_file)
+
+    @patch("solidlsp.language_servers.csharp_language_server.CSharpLanguageServer._ensure_server_installed")
+    @patch("solidlsp.language_servers.csharp_language_server.CSharpLanguageServer._start_server")
+    def test_solution_discovery_is_refreshed_on_restart(self, mock_start_server, mock_ensure_server_installed):
+        """Test that each language server instance discovers solution/project files added or removed since the last start."""
+        mock_ensure_server_installed.return_value = ("/usr/bin/dotnet", "/path/to/server.dll")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            project_file = temp_path / "A.csproj"
+            project_file.touch()
+
+            mock_config = Mock(spec=LanguageServerConfig)
+            mock_config.ignored_paths = []
+            mock_settings = Mock(spec=SolidLSPSettings)
+            mock_settings.ls_resources_dir = "/tmp/test_ls_resources"
+            CSharpLanguageServer(mock_config, Mock(), str(temp_path), mock_settings)
+            assert _scan_solution_and_project_files(str(temp_path)) == (None, [str(project_file)])
+
+            # Change the solution/project files and restart, i.e. create a new instance
+            project_file.unlink()
+            (temp_path / "src").mkdir()
+            solution_file = temp_path / "src" / "New.sln"
+            solution_file.touch()
+            new_project_file = temp_path / "src" / "B.csproj"
+            new_project_file.touch()
+            mock_logger = Mock()
+            CSharpLanguageServer(mock_config, mock_logger, str(temp_path), mock_settings)
+
+            mock_logger.log.assert_any_call(f"Found solution/project file: {solution_file}", 20)  # logging.INFO
+            assert _scan_solution_and_project_files(str(temp_path)) == (str(solution_file), [str(new_project_file)])
+
+    def test_solution_discovery_and_opening_share_one_scan(self):
+        """Test that finding the solution/project file and collecting the files to open scan the repository only once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            project_file = temp_path / "MyProject.csproj"
+            project_file.touch()
+
+            assert find_solution_or_project_file(str(temp_path)) == str(project_file)
+            assert _scan_solution_and_project_files(str(temp_path)) == (None, [str(project_file)])
+            assert _scan_solution_and_project_files_cached.cache_info().misses == 1
+
+    def test_scan_solution_and_project_files(self):
+        """Test that the single-pass scan finds the first .sln file and all .csproj files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+
+            (temp_path / "src").mkdir()
+            solution_file = temp_path / "src" / "MySolution.sln"
+            solution_file.touch()
+            (temp_path / "src" / "App").mkdir()
+            app_project = temp_path / "src" / "App" / "App.csproj"
+            app_project.touch()
+            root_project = temp_path / "Root.csproj"
+            root_project.touch()
+            (temp_path / "obj").mkdir()
+            (temp_path / "obj" / "Generated.csproj").touch()
+
+            sln_file, csproj_files = _scan_solution_and_project_files(str(temp_path))
+
+            assert sln_file == str(solution_file)
+            # Project files are returned in breadth-first order, skipping ignored directories
+            assert csproj_files == [str(root_project), str(app_project)]
+
     @patch("solidlsp.language_servers.csharp_language_server.CSharpLanguageServer._ensure_server_installed")
     @patch("solidlsp.language_servers.csharp_language_server.CSharpLanguageServer._start_server")
     def test_csharp_language_server_logs_solution_discovery(self, mock_start_server, mock_ensure_server_installed):
@@ -303,3 +396,21 @@ class TestCSharpSolutionProjectOpening:
 
         # Verify the file actually exists
         assert os.path.exists(result)
+
+
+@pytest.mark.csharp
+@pytest.mark.parametrize(
+    "section, expected",
+    [
+        ("tab_width", 4),
+        ("insert_final_newline", True),
+        ("dotnet_member_insertion_location", "with_other_members_of_the_same_kind"),
+        ("csharp|inlay_hints.dotnet_enable_inlay_hints_for_parameters", False),
+        ("csharp|background_analysis.dotnet_analyzer_diagnostics_scope", "openFiles"),
+        ("csharp|code_style.formatting.indentation_and_spacing.new_line_behavior", None),
+        ("editor.unknown_setting", None),
+    ],
+)
+def test_workspace_configuration_value(section: str, expected) -> None:
+    """Test the values provided for workspace/configuration requests of the language server."""
+    assert _get_workspace_configuration_value(section) == expected